@@ -6,7 +6,7 @@ import asyncpg
 import discord
 import pygicord
 
-from aiohttp import ClientSession
+from aiohttp import TCPConnector, ClientSession
 from termcolor import colored
 from discord.ext import commands
 
@@ -17,6 +17,7 @@ from utils.time import human_timedelta
 from utils.checks import global_cooldown
 from utils.scrape import get_overwatch_maps, get_overwatch_heroes
 from classes.context import Context
+from classes.converters import cache_hero_map
 
 try:
     import uvloop
@@ -39,6 +40,8 @@ class Bot(commands.AutoShardedBot):
         self.prefixes = {}
         self.premiums = {}
         self.embed_colors = {}
+        self.nickname_ids = set()
+        self.nickname_profile_ids = set()
         self.heroes = []
         self.maps = []
         self.hero_names = []
@@ -184,6 +187,7 @@ class Bot(commands.AutoShardedBot):
 
     def cache_hero_names(self):
         self.hero_names = [str(h["key"]).lower() for h in self.heroes]
+        cache_hero_map(self.hero_names)
 
     async def cache_embed_colors(self):
         embed_colors = {}
@@ -193,10 +197,21 @@ class Bot(commands.AutoShardedBot):
             embed_colors[member_id] = color
         self.embed_colors = embed_colors
 
+    async def cache_nicknames(self):
+        nicknames = await self.pool.fetch("SELECT id, profile_id FROM nickname;")
+        self.nickname_ids = {n["id"] for n in nicknames}
+        self.nickname_profile_ids = {n["profile_id"] for n in nicknames}
+
     async def start(self, *args, **kwargs):
-        self.session = ClientSession(loop=self.loop)
+        # shared by every request so connections (and DNS lookups) get reused
+        connector = TCPConnector(ttl_dns_cache=300, keepalive_timeout=75)
+        self.session = ClientSession(connector=connector, loop=self.loop)
         self.pool = await asyncpg.create_pool(
-            **config.database, max_size=20, command_timeout=60.0
+            **config.database,
+            max_size=20,
+            command_timeout=60.0,
+            statement_cache_size=1024,
+            max_cached_statement_lifetime=300,
         )
 
         self.compute_sloc()
@@ -204,6 +219,7 @@ class Bot(commands.AutoShardedBot):
         await self.cache_prefixes()
         await self.cache_premiums()
         await self.cache_embed_colors()
+        await self.cache_nicknames()
         await self.cache_heroes()
         self.cache_hero_names()
         await self.cache_maps()
@@ -1,27 +1,60 @@
+from types import MappingProxyType
+from string import ascii_uppercase
+from functools import lru_cache
+
 from discord.ext import commands
 
 from utils.i18n import _
 
+_HERO_ALIASES = MappingProxyType(
+    {
+        "soldier": "soldier76",
+        "soldier-76": "soldier76",
+        "wreckingball": "wreckingBall",
+        "dva": "dVa",
+        "d.va": "dVa",
+    }
+)
+
+# lowercases ASCII letters and folds the accented letters used by
+# hero names (e.g. Lúcio, Torbjörn) in a single pass
+_FOLD = str.maketrans(
+    {
+        **{c: c.lower() for c in ascii_uppercase},
+        "ú": "u",
+        "Ú": "u",
+        "ö": "o",
+        "Ö": "o",
+        "é": "e",
+        "É": "e",
+    }
+)
+
+# maps every accepted (folded) hero name or alias to its canonical key
+_HERO_MAP: dict[str, str] = {}
+
+
+def cache_hero_map(hero_names):
+    """Rebuild the hero lookup table from the given hero names."""
+    _HERO_MAP.clear()
+    _HERO_MAP.update({name: name for name in hero_names})
+    _HERO_MAP.update(_HERO_ALIASES)
+    _resolve_hero.cache_clear()
+
+
+@lru_cache(maxsize=512)
+def _resolve_hero(argument):
+    return _HERO_MAP.get(argument.translate(_FOLD))
+
 
 class Hero(commands.Converter):
     async def convert(self, ctx, argument):
-        hero_ = argument.lower()
-        aliases = {
-            "soldier": "soldier76",
-            "soldier-76": "soldier76",
-            "wreckingball": "wreckingBall",
-            "dva": "dVa",
-            "d.va": "dVa",
-            "lúcio": "lucio",
-        }
-
-        hero = aliases.get(hero_)
+        if not _HERO_MAP:
+            cache_hero_map(ctx.bot.hero_names)
+
+        hero = _resolve_hero(argument)
         if hero is None:
-            if hero_ not in ctx.bot.hero_names:
-                raise commands.BadArgument(
-                    _("Unknown hero: **{hero}**.").format(hero=argument)
-                )
-            else:
-                return hero_
-        else:
-            return hero
+            raise commands.BadArgument(
+                _("Unknown hero: **{hero}**.").format(hero=argument)
+            )
+        return hero
@@ -37,13 +37,12 @@ class NoHeroStats(PlayerException):
 
 class Player:
 
-    __slots__ = ("data", "platform", "username", "pages")
+    __slots__ = ("data", "platform", "username")
 
     def __init__(self, data: dict, *, platform: str, username: str):
         self.data = data
         self.platform = platform
         self.username = username
-        self.pages = []
 
     def __str__(self):
         return self.data["name"]
@@ -105,10 +104,8 @@ class Player:
 
         query = """SELECT tank, damage, support
                    FROM rating
-                   INNER JOIN profile
-                           ON profile.id = rating.profile_id
-                   WHERE profile.id = $1
-                   AND rating.date = $2;
+                   WHERE profile_id = $1
+                   AND date = $2;
                 """
 
         requested_at = date.today()
@@ -195,6 +192,7 @@ class Player:
     def get_stats(self, ctx, hero):
         keys, quickplay, competitive = self.resolve_stats(hero)
 
+        pages = []
         for i, key in enumerate(keys, start=1):
             embed = discord.Embed(color=ctx.bot.color(ctx.author.id))
             embed.title = self.format_key(key)
@@ -207,8 +205,8 @@ class Player:
                 text=_("Page {current}/{total}").format(current=i, total=len(keys))
             )
             self.format_stats(embed, key, quickplay, competitive)
-            self.pages.append(embed)
-        return self.pages
+            pages.append(embed)
+        return pages
 
     def private(self):
         embed = discord.Embed(color=discord.Color.red())
@@ -1,3 +1,4 @@
+import orjson
 import aiohttp
 
 import config
@@ -49,6 +50,9 @@ class UnexpectedError(RequestError):
 
 class TooManyAccounts(RequestError):
     def __init__(self, platform, username, players):
+        self.platform = platform
+        self.username = username
+        self.players = players
         if platform == "pc":
             fmt = "BattleTag"
         elif platform == "nintendo-switch":
@@ -63,12 +67,13 @@ class TooManyAccounts(RequestError):
 
 class Request:
 
-    __slots__ = ("platform", "username", "username_l")
+    __slots__ = ("platform", "username", "username_l", "session")
 
-    def __init__(self, platform: str, username: str):
+    def __init__(self, platform: str, username: str, *, session: aiohttp.ClientSession):
         self.platform = platform
         self.username = username
         self.username_l = username.lower()
+        self.session = session
 
     @property
     def account_url(self):
@@ -103,14 +108,13 @@ class Request:
             return self.username
 
     async def get_name(self):
-        async with aiohttp.ClientSession() as s:
-            async with s.get(self.account_url) as r:
-                try:
-                    name = await r.json()
-                except aiohttp.ContentTypeError:
-                    raise UnexpectedError()
-                else:
-                    return await self.resolve_name(name)
+        async with self.session.get(self.account_url) as r:
+            try:
+                name = orjson.loads(await r.read())
+            except orjson.JSONDecodeError:
+                raise UnexpectedError()
+            else:
+                return await self.resolve_name(name)
 
     async def url(self):
         name = await self.get_name()
@@ -118,7 +122,10 @@ class Request:
 
     async def resolve_response(self, response):
         if response.status == 200:
-            data = await response.json()
+            try:
+                data = orjson.loads(await response.read())
+            except orjson.JSONDecodeError:
+                raise UnexpectedError()
             if data.get("error"):
                 raise UnexpectedError()
             return data
@@ -133,12 +140,11 @@ class Request:
 
     async def request(self):
         url = await self.url()
-        async with aiohttp.ClientSession() as s:
-            async with s.get(url) as r:
-                try:
-                    return await self.resolve_response(r)
-                except aiohttp.client_exceptions.ClientPayloadError:
-                    raise UnexpectedError()
+        async with self.session.get(url) as r:
+            try:
+                return await self.resolve_response(r)
+            except aiohttp.client_exceptions.ClientPayloadError:
+                raise UnexpectedError()
 
     async def get(self):
         return await self.request()
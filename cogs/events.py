@@ -77,6 +77,12 @@ class Events(commands.Cog):
     async def on_guild_remove(self, guild):
         with suppress(KeyError):
             del self.bot.prefixes[guild.id]
+        query = "DELETE FROM nickname WHERE server_id = $1 RETURNING id, profile_id;"
+        nicknames = await self.bot.pool.fetch(query, guild.id)
+        self.bot.nickname_ids.difference_update(n["id"] for n in nicknames)
+        self.bot.nickname_profile_ids.difference_update(
+            n["profile_id"] for n in nicknames
+        )
         await self.bot.pool.execute("DELETE FROM server WHERE id = $1;", guild.id)
 
         if self.bot.debug:
@@ -85,6 +91,20 @@ class Events(commands.Cog):
         embed = discord.Embed(color=discord.Color.red())
         await self.send_guild_log(guild, embed)
 
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        if member.id not in self.bot.nickname_ids:
+            return
+        # the nickname can only be set in one server
+        query = """DELETE FROM nickname
+                   WHERE id = $1 AND server_id = $2
+                   RETURNING profile_id;
+                """
+        profile_id = await self.bot.pool.fetchval(query, member.id, member.guild.id)
+        if profile_id is not None:
+            self.bot.nickname_ids.discard(member.id)
+            self.bot.nickname_profile_ids.discard(profile_id)
+
     @commands.Cog.listener()
     async def on_command(self, ctx):
         query = """INSERT INTO member (id)
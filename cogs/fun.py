@@ -1,3 +1,4 @@
+import time
 import secrets
 
 import discord
@@ -7,6 +8,7 @@ from discord.ext import commands
 from utils.i18n import _, locale
 
 MEME_CATEGORIES = ("hot", "new", "top", "rising")
+MEMES_TTL = 300.0
 
 
 def valid_hero_cat(argument):
@@ -57,6 +59,7 @@ def valid_meme_cat(argument):
 class Fun(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self._memes = {}
 
     def get_random_hero(self, category):
         heroes = self.bot.heroes
@@ -76,7 +79,15 @@ class Fun(commands.Cog):
             map_ = secrets.choice(categorized_maps)
         return map_["name"]
 
-    async def get_meme(self, category):
+    async def get_memes(self, category):
+        try:
+            timestamp, memes = self._memes[category]
+        except KeyError:
+            pass
+        else:
+            if time.monotonic() - timestamp < MEMES_TTL:
+                return memes
+
         url = f"https://www.reddit.com/r/Overwatch_Memes/{category}.json"
         async with self.bot.session.get(url) as r:
             memes = await r.json()
@@ -87,6 +98,11 @@ class Fun(commands.Cog):
             if not meme["data"]["secure_media"]
             or not meme["data"]["is_reddit_media_domain"]
         ]
+        self._memes[category] = (time.monotonic(), memes)
+        return memes
+
+    async def get_meme(self, category):
+        memes = await self.get_memes(category)
         return secrets.choice(memes)
 
     def embed_meme(self, ctx, meme):
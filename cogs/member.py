@@ -1,16 +1,37 @@
+import re
+
 import discord
 
-from colour import Color
+from colour import COLOR_NAME_TO_RGB, Color
 from discord.ext import commands
 
 from utils.i18n import _, locale
 from utils.checks import is_premium
 
+_HEX_COLOR = re.compile(r"#([0-9a-fA-F]{3}|[0-9a-fA-F]{6})")
+_NAMED_COLORS = {
+    name: (r << 16) + (g << 8) + b for name, (r, g, b) in COLOR_NAME_TO_RGB.items()
+}
+
 
 def valid_color(argument):
-    if argument.lower() == "none":
+    name = argument.lower()
+    if name == "none":
         return None
 
+    # fast paths for color names and hex codes, anything else
+    # is left to `Color`
+    color = _NAMED_COLORS.get(name)
+    if color is not None:
+        return color
+
+    match = _HEX_COLOR.fullmatch(argument)
+    if match is not None:
+        digits = match.group(1)
+        if len(digits) == 3:
+            digits = "".join(c * 2 for c in digits)
+        return int(digits, 16)
+
     try:
         color = Color(argument).get_hex_l()
     except (AttributeError, ValueError):
@@ -25,6 +46,12 @@ def valid_color(argument):
 class Member(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # (name, display name, description) of each setting
+        self.settings_fields = [
+            # remove `[Premium]` from docstring
+            (s.name, s.name.capitalize(), s.short_doc[12:] if s.short_doc else None)
+            for s in self.settings.commands
+        ]
 
     @commands.command(brief=_("Shows your premium status."))
     @commands.guild_only()
@@ -59,8 +86,7 @@ class Member(commands.Cog):
             "color": color_value,
         }
 
-    async def embed_member_settings(self, ctx, command):
-        subcommands = getattr(command, "commands", None)
+    async def embed_member_settings(self, ctx):
         settings = await self.get_member_settings(ctx.author.id)
 
         description = _(
@@ -75,18 +101,13 @@ class Member(commands.Cog):
         embed.description = description
 
         value = ""
-        for subcommand in subcommands:
-            if subcommand.short_doc:
-                # remove `[Premium]` from docstring
-                short_doc = subcommand.short_doc[12:]
-            else:
-                short_doc = _("No help found...")
-
-            name = subcommand.name.capitalize()
+        for key, name, short_doc in self.settings_fields:
             value += "**{name}** - `{setting}`\n*{description}*\n\n".format(
-                name=name, description=short_doc, setting=settings[subcommand.name]
+                name=name,
+                description=short_doc or _("No help found..."),
+                setting=settings[key],
             )
-            embed.add_field(name="Your settings", value=value)
+        embed.add_field(name="Your settings", value=value)
 
         return embed
 
@@ -97,7 +118,7 @@ class Member(commands.Cog):
     @locale
     async def settings(self, ctx):
         _("""`[Premium]` Update your settings.""")
-        embed = await self.embed_member_settings(ctx, ctx.command)
+        embed = await self.embed_member_settings(ctx)
         await ctx.send(embed=embed)
 
     @is_premium()
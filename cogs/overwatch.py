@@ -1,3 +1,8 @@
+import time
+import asyncio
+
+from collections import defaultdict
+
 import discord
 
 from discord.ext import commands
@@ -9,6 +14,9 @@ from utils.scrape import (
     get_overwatch_patch_notes,
 )
 
+NEWS_TTL = 600.0
+STATUS_TTL = 60.0
+
 
 class Overwatch(commands.Cog):
     def __init__(self, bot):
@@ -17,6 +25,24 @@ class Overwatch(commands.Cog):
             "no problems at overwatch",
             "user reports indicate no current problems at overwatch",
         )
+        self._cache = {}
+        self._locks = defaultdict(asyncio.Lock)
+
+    async def cached(self, key, ttl, func, *args, **kwargs):
+        """Return the cached result of `func` if fresher than `ttl` seconds."""
+        # the lock prevents concurrent invocations from scraping the same page
+        async with self._locks[key]:
+            try:
+                timestamp, result = self._cache[key]
+            except KeyError:
+                pass
+            else:
+                if time.monotonic() - timestamp < ttl:
+                    return result
+
+            result = await func(*args, **kwargs)
+            self._cache[key] = (time.monotonic(), result)
+            return result
 
     def format_overwatch_status(self, status):
         if status.lower() in self.statuses:
@@ -40,7 +66,7 @@ class Overwatch(commands.Cog):
         embed.set_footer(text="downdetector.com")
 
         try:
-            overwatch = await get_overwatch_status()
+            overwatch = await self.cached("status", STATUS_TTL, get_overwatch_status)
         except Exception:
             embed.color = self.bot.color(ctx.author.id)
             embed.description = (
@@ -69,7 +95,11 @@ class Overwatch(commands.Cog):
             locale = self.bot.locales.get(ctx.author.id, "en_US")
 
             try:
-                news = await get_overwatch_news(locale, amount=abs(amount))
+                # cache the whole listing so the keys are bounded by the locales
+                news = await self.cached(
+                    ("news", locale), NEWS_TTL, get_overwatch_news, locale, amount=None
+                )
+                news = news[: abs(amount)]
             except Exception:
                 embed = discord.Embed(color=self.bot.color(ctx.author.id))
                 embed.title = _("Latest Overwatch News")
@@ -1,15 +1,17 @@
 import asyncio
 
 from io import BytesIO
+from types import MappingProxyType
 from contextlib import suppress
 
-import pandas as pd
+import numpy as np
 import discord
-import seaborn as sns
 import matplotlib
 
-from matplotlib import pyplot
 from discord.ext import commands
+from matplotlib.dates import DateFormatter
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 from utils.i18n import _, locale
 from utils.checks import is_premium, has_profile, can_add_profile
@@ -20,11 +22,13 @@ from classes.converters import Hero
 from classes.exceptions import NoChoice
 
 MAX_NICKNAME_LENGTH = 32
-ROLES = {
-    "tank": "\N{SHIELD}",
-    "damage": "\N{CROSSED SWORDS}",
-    "support": "\N{HEAVY GREEK CROSS}",
-}
+ROLES = MappingProxyType(
+    {
+        "tank": "\N{SHIELD}",
+        "damage": "\N{CROSSED SWORDS}",
+        "support": "\N{HEAVY GREEK CROSS}",
+    }
+)
 PLATFORMS = {
     "pc": "<:battlenet:679469162724196387>",
     "psn": "<:psn:679468542541693128>",
@@ -32,10 +36,39 @@ PLATFORMS = {
     "nintendo-switch": "<:nsw:752653766377078817>",
 }
 
-
-async def chunker(entries, chunk):
-    for x in range(0, len(entries), chunk):
-        yield entries[x : x + chunk]
+_Q_GET_PROFILES = """SELECT profile.id, platform, username
+                     FROM profile
+                     INNER JOIN member
+                             ON member.id = profile.member_id
+                     WHERE member.id = $1
+                     LIMIT $2;
+                  """
+_Q_GET_PROFILE = """SELECT profile.id, platform, username
+                    FROM profile
+                    INNER JOIN member
+                            ON member.main_profile = profile.id
+                    WHERE member.id = $1;
+                 """
+_Q_SR_GRAPH = """SELECT tank, damage, support, date
+                 FROM rating
+                 WHERE profile_id = $1
+                 ORDER BY date;
+              """
+_Q_DELETE_PROFILE = "DELETE FROM profile WHERE id = $1;"
+
+# graphs are only rendered to files, no need to probe for a GUI backend
+matplotlib.use("Agg")
+matplotlib.rcParams.update(
+    {
+        "axes.facecolor": "#EAEAF2",
+        "axes.edgecolor": "white",
+        "axes.axisbelow": True,
+        "axes.grid": True,
+        "grid.color": "white",
+        "xtick.bottom": False,
+        "ytick.left": False,
+    }
+)
 
 
 def valid_index(argument):
@@ -44,6 +77,30 @@ def valid_index(argument):
     return int(argument)
 
 
+def render_graph(roles, title):
+    """Render the SRs graph as PNG. Blocking, meant to run in a thread."""
+    # build the figure without pyplot, so it is not tracked by its global
+    # state and gets garbage collected once the image is rendered
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    ax.xaxis_date()
+
+    for role, (dates, values) in roles.items():
+        ax.plot(dates, values, label=role, linewidth=2.5)
+    ax.xaxis.set_major_formatter(DateFormatter("%Y-%m-%d"))
+    fig.autofmt_xdate()
+
+    fig.suptitle(title, fontsize="20")
+    ax.legend(title="Roles", loc="upper right")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("SR")
+
+    image = BytesIO()
+    canvas.print_png(image)
+    return image.getvalue()
+
+
 class Profile(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -51,14 +108,7 @@ class Profile(commands.Cog):
     async def get_profiles(self, ctx, *, member=None):
         member = member or ctx.author
         limit = self.bot.get_max_profiles_limit(ctx)
-        query = """SELECT profile.id, platform, username
-                   FROM profile
-                   INNER JOIN member
-                           ON member.id = profile.member_id
-                   WHERE member.id = $1
-                   LIMIT $2;
-                """
-        profiles = await self.bot.pool.fetch(query, member.id, limit)
+        profiles = await self.bot.pool.fetch(_Q_GET_PROFILES, member.id, limit)
         if not profiles:
             raise commands.BadArgument("This member did not linked a profile.")
         return profiles
@@ -72,13 +122,7 @@ class Profile(commands.Cog):
             except IndexError:
                 raise commands.BadArgument(_("Invalid index.")) from None
         else:
-            query = """SELECT profile.id, platform, username
-                       FROM profile
-                       INNER JOIN member
-                               ON member.main_profile = profile.id
-                       WHERE member.id = $1;
-                    """
-            profile = await self.bot.pool.fetchrow(query, member.id)
+            profile = await self.bot.pool.fetchrow(_Q_GET_PROFILE, member.id)
         if not profile:
             raise commands.BadArgument("This member did not linked a profile.")
         return profile
@@ -105,27 +149,35 @@ class Profile(commands.Cog):
         query = "UPDATE profile SET platform = $1, username = $2 WHERE id = $3;"
         await self.bot.pool.execute(query, platform, username, profile_id)
 
+    async def delete_profiles(self, ids):
+        await self.bot.pool.executemany(_Q_DELETE_PROFILE, [(i,) for i in ids])
+
     async def list_profiles(self, ctx, profiles):
         pages = []
-        chunks = [c async for c in chunker(profiles, 10)]
+        chunks = [profiles[x : x + 10] for x in range(0, len(profiles), 10)]
         index = 1  # avoid resetting index to 1 every page
         limit = self.bot.get_max_profiles_limit(ctx)
+        color = self.bot.color(ctx.author.id)
+        author_name = str(ctx.author)
+        author_icon = ctx.author.avatar_url
+        footer = _("{profiles}/{limit} profiles").format(
+            profiles=len(profiles), limit=limit
+        )
+
+        query = "SELECT main_profile FROM member WHERE id = $1;"
+        main_profile = await self.bot.pool.fetchval(query, ctx.author.id)
 
         for chunk in chunks:
-            embed = discord.Embed(color=self.bot.color(ctx.author.id))
-            embed.set_author(name=str(ctx.author), icon_url=ctx.author.avatar_url)
-            embed.set_footer(
-                text=_("{profiles}/{limit} profiles").format(
-                    profiles=len(profiles), limit=limit
-                )
-            )
+            embed = discord.Embed(color=color)
+            embed.set_author(name=author_name, icon_url=author_icon)
+            embed.set_footer(text=footer)
 
             description = []
             for (id_, platform, username) in chunk:
                 if platform == "pc":
                     username = username.replace("-", "#")
                 fmt = f"{index}. {PLATFORMS.get(platform)} - {username}"
-                if await self.is_main_profile(ctx.author.id, profile_id=id_):
+                if id_ == main_profile:
                     fmt += " `main`"
                 description.append(fmt)
                 index += 1
@@ -159,21 +211,15 @@ class Profile(commands.Cog):
         else:
             return message.content.replace("#", "-")
 
-    async def has_nickname(self, member_id):
-        query = "SELECT id FROM nickname WHERE id = $1;"
-        return await self.bot.pool.fetchval(query, member_id)
+    def has_nickname(self, member_id):
+        return member_id in self.bot.nickname_ids
 
     async def make_nickname(self, member, *, profile):
         ratings = profile.resolve_ratings()
         if not ratings:
             return f"{member.name[:21]} [Unranked]"
 
-        tmp = ""
-        for key, value in ratings.items():
-            tmp += f"{ROLES.get(key)}{value}/"
-
-        # tmp[:-1] removes the last slash
-        tmp = "[" + tmp[:-1] + "]"
+        tmp = "[" + "/".join(f"{ROLES[k]}{v}" for k, v in ratings.items()) + "]"
 
         # dinamically assign the nickname's length based on
         # player's SR. -1 indicates the space between
@@ -192,30 +238,47 @@ class Profile(commands.Cog):
         else:
             nick = None
 
-        try:
-            await member.edit(nick=nick)
-        except discord.Forbidden:
+        if not remove:
+            query = (
+                "INSERT INTO nickname(id, server_id, profile_id) VALUES($1, $2, $3);"
+            )
+            args = (member.id, ctx.guild.id, profile_id)
+        else:
+            query = "DELETE FROM nickname WHERE id = $1 RETURNING profile_id;"
+            args = (member.id,)
+
+        # edit the nickname while the query is being executed
+        edited, executed = await asyncio.gather(
+            member.edit(nick=nick),
+            self.bot.pool.fetchval(query, *args),
+            return_exceptions=True,
+        )
+
+        if isinstance(edited, discord.Forbidden):
             await ctx.send(
                 _(
                     "I can't change nicknames in this server. Grant me `Manage Nicknames` permission."
                 )
             )
-        except discord.HTTPException:
+        elif isinstance(edited, discord.HTTPException):
             await ctx.send(_("Something bad happened while updating your nickname."))
+        elif isinstance(edited, Exception):
+            raise edited
+
+        if isinstance(executed, Exception):
+            raise executed
 
         if not remove:
-            query = (
-                "INSERT INTO nickname(id, server_id, profile_id) VALUES($1, $2, $3);"
-            )
-            await self.bot.pool.execute(query, member.id, ctx.guild.id, profile_id)
+            self.bot.nickname_ids.add(member.id)
+            self.bot.nickname_profile_ids.add(profile_id)
             await ctx.send(_("Nickname successfully set."))
         else:
-            query = "DELETE FROM nickname WHERE id = $1;"
-            await self.bot.pool.execute(query, member.id)
+            self.bot.nickname_ids.discard(member.id)
+            self.bot.nickname_profile_ids.discard(executed)
             await ctx.send(_("Nickname successfully removed."))
 
     async def update_nickname_sr(self, member, *, profile):
-        if not await self.has_nickname(member.id):
+        if not self.has_nickname(member.id):
             return
 
         nick = await self.make_nickname(member, profile=profile)
@@ -294,7 +357,11 @@ class Profile(commands.Cog):
         ):
             return
 
-        await self.bot.pool.execute("DELETE FROM profile WHERE id = $1;", id_)
+        await self.delete_profiles([id_])
+        # the nickname gets deleted along with the profile it is linked to
+        if id_ in self.bot.nickname_profile_ids:
+            self.bot.nickname_ids.discard(ctx.author.id)
+            self.bot.nickname_profile_ids.discard(id_)
         await ctx.send(_("Profile successfully unlinked."))
 
     @has_profile()
@@ -366,14 +433,14 @@ class Profile(commands.Cog):
                 ctx, member=member, index=index
             )
 
-            data = await Request(platform, username).get()
+            data = await Request(platform, username, session=self.bot.session).get()
             profile = Player(data, platform=platform, username=username)
             if profile.is_private():
                 embed = profile.private()
             else:
                 embed = await profile.get_ratings(ctx, save=True, profile_id=id_)
-                # if the index is None that means it's the main profile
-                if not index and member.id == ctx.author.id:
+                # only update the nickname if it shows this profile's SRs
+                if id_ in self.bot.nickname_profile_ids and member.id == ctx.author.id:
                     await self.update_nickname_sr(ctx.author, profile=profile)
             await ctx.send(embed=embed)
 
@@ -397,15 +464,14 @@ class Profile(commands.Cog):
         Provide both the index and the member to see a member's stats.
         """
         )
-        async with ctx.typing():
-            member = member or ctx.author
-            unused, platform, username = await self.get_profile(
-                ctx, member=member, index=index
-            )
+        member = member or ctx.author
+        unused, platform, username = await self.get_profile(
+            ctx, member=member, index=index
+        )
 
-            cog = self.bot.get_cog("Stats")
-            if cog:
-                await cog.show_stats_for(ctx, "allHeroes", platform, username)
+        cog = self.bot.get_cog("Stats")
+        if cog:
+            await cog.show_stats_for(ctx, "allHeroes", platform, username)
 
     @has_profile()
     @profile.command(brief=_("Provides general hero stats for a profile."))
@@ -426,15 +492,14 @@ class Profile(commands.Cog):
         Provide both the index and the member to see a member's stats.
         """
         )
-        async with ctx.typing():
-            member = member or ctx.author
-            unused, platform, username = await self.get_profile(
-                ctx, member=member, index=index
-            )
+        member = member or ctx.author
+        unused, platform, username = await self.get_profile(
+            ctx, member=member, index=index
+        )
 
-            cog = self.bot.get_cog("Stats")
-            if cog:
-                await cog.show_stats_for(ctx, hero, platform, username)
+        cog = self.bot.get_cog("Stats")
+        if cog:
+            await cog.show_stats_for(ctx, hero, platform, username)
 
     @has_profile()
     @profile.command(aliases=["nick"], brief=_("Shows your SRs in your nickname."))
@@ -450,7 +515,7 @@ class Profile(commands.Cog):
         is used and the profile matches the one set for the nickname.
         """
         )
-        if not await self.has_nickname(ctx.author.id):
+        if not self.has_nickname(ctx.author.id):
             if not await ctx.prompt(_("This will display your SRs in your nickname.")):
                 return
 
@@ -464,7 +529,7 @@ class Profile(commands.Cog):
                 )
 
             id_, platform, username = await self.get_profile(ctx)
-            data = await Request(platform, username).get()
+            data = await Request(platform, username, session=self.bot.session).get()
             profile = Player(data, platform=platform, username=username)
 
             if profile.is_private():
@@ -484,51 +549,28 @@ class Profile(commands.Cog):
     async def sr_graph(self, ctx, *, profile):
         id_, platform, username = profile
 
-        query = """SELECT tank, damage, support, date
-                   FROM rating
-                   INNER JOIN profile
-                           ON profile.id = rating.profile_id
-                   WHERE profile.id = $1
-                """
-
-        ratings = await self.bot.pool.fetch(query, id_)
+        ratings = await self.bot.pool.fetch(_Q_SR_GRAPH, id_)
 
-        sns.set()
-        sns.set_style("darkgrid")
+        dates = np.array([r["date"] for r in ratings])
+        roles = {}
+        for role in ("tank", "damage", "support"):
+            # missing ratings (NULL) become NaN, drop them so that the
+            # remaining points of each role are still connected
+            values = np.array([r[role] for r in ratings], dtype=float)
+            mask = ~np.isnan(values)
+            if mask.any():
+                roles[role] = (dates[mask], values[mask])
 
-        data = pd.DataFrame.from_records(
-            ratings,
-            columns=["tank", "damage", "support", "date"],
-            index="date",
-        )
-
-        for row in ["support", "damage", "tank"]:
-            if data[row].isnull().all():
-                data.drop(row, axis=1, inplace=True)
-
-        if len(data.columns) == 0:
+        if not roles:
             raise commands.BadArgument(
                 _("I don't have enough data to create the graph.")
             )
 
-        fig, ax = pyplot.subplots()
-        ax.xaxis_date()
-
-        sns.lineplot(data=data, ax=ax, linewidth=2.5)
-        ax.xaxis.set_major_formatter(matplotlib.dates.DateFormatter("%Y-%m-%d"))
-        fig.autofmt_xdate()
-
         username = username.replace("-", "#")
-        fig.suptitle(f"{username} - {platform}", fontsize="20")
-        pyplot.legend(title="Roles", loc="upper right")
-        pyplot.xlabel("Date")
-        pyplot.ylabel("SR")
-
-        image = BytesIO()
-        pyplot.savefig(format="png", fname=image, transparent=False)
-        image.seek(0)
+        title = f"{username} - {platform}"
+        image = await asyncio.to_thread(render_graph, roles, title)
 
-        file = discord.File(image, filename="graph.png")
+        file = discord.File(BytesIO(image), filename="graph.png")
 
         embed = discord.Embed(color=self.bot.color(ctx.author.id))
         embed.set_author(name=str(ctx.author), icon_url=ctx.author.avatar_url)
@@ -1,48 +1,208 @@
+import re
+import json
+import time
+import asyncio
+
+from functools import partial, lru_cache
+from contextlib import suppress
+from collections import OrderedDict, deque
+
+import discord
+
 from discord.ext import commands
 
 from utils.i18n import _, locale
 from classes.player import Player
-from classes.request import Request
+from classes.request import Request, NotFound, RequestError, TooManyAccounts
 from classes.converters import Hero
 
+_PLATFORM_ALIASES = {
+    "pc": "pc",
+    "bnet": "pc",
+    "xbl": "xbl",
+    "xbox": "xbl",
+    "ps": "psn",
+    "psn": "psn",
+    "ps4": "psn",
+    "play": "psn",
+    "playstation": "psn",
+    "nsw": "nintendo-switch",
+    "switch": "nintendo-switch",
+    "nintendo-switch": "nintendo-switch",
+}
 
-def valid_platform(argument):
-    valid = {
-        "pc": "pc",
-        "bnet": "pc",
-        "xbl": "xbl",
-        "xbox": "xbl",
-        "ps": "psn",
-        "psn": "psn",
-        "ps4": "psn",
-        "play": "psn",
-        "playstation": "psn",
-        "nsw": "nintendo-switch",
-        "switch": "nintendo-switch",
-        "nintendo-switch": "nintendo-switch",
-    }
+# Loose username formats used to reject obviously malformed names before
+# requesting them. BattleTags and Nintendo Switch IDs can be given without
+# their code, the API then searches for players by name.
+_USERNAME_PATTERNS = {
+    "pc": re.compile(r"[^\s#]{3,12}([#-]\d{3,})?"),
+    "psn": re.compile(r"[A-Za-z0-9_-]{3,16}"),
+    "xbl": re.compile(r"[\w ]{1,15}(#\d{1,4})?"),
+    "nintendo-switch": re.compile(r"[^#]+"),
+}
+
+MAX_PLAYERS = 5
+PROFILE_TTL = 60.0
+# private profiles and players not found are unlikely to change any time soon
+UNAVAILABLE_TTL = 300.0
+PROFILE_CACHE_SIZE = 256
+# recently requested players, saved on shutdown to warm the cache on startup
+RECENT_QUERIES_FILE = "recent_queries.json"
+RECENT_QUERIES_SIZE = 50
+WARM_UP_CONCURRENCY = 4
+# warmed players must outlive the warm up itself to be of any use
+WARM_UP_TTL = 600.0
 
+# (platform, username) -> (expires_at, player), least recently used first.
+# player is None for players not found
+_PROFILE_CACHE = OrderedDict()
+# (platform, username) -> task fetching the player data
+_INFLIGHT = {}
+
+
+def _fetch_done(key, task):
+    _INFLIGHT.pop(key, None)
+    # retrieve the exception, so it is not logged if every caller was cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+async def _fetch(session, platform, username):
+    """Fetch the player data, sharing the request with concurrent callers."""
+    key = (platform, username)
+    task = _INFLIGHT.get(key)
+    if task is None:
+        request = Request(platform, username, session=session)
+        task = asyncio.create_task(request.get())
+        _INFLIGHT[key] = task
+        task.add_done_callback(partial(_fetch_done, key))
     try:
-        platform = valid[argument.lower()]
+        # a cancelled caller must not cancel the request for the others
+        return await asyncio.shield(task)
+    # the task translated its error for the locale of the first caller,
+    # raise a new one so that each caller gets it in their own locale
+    except TooManyAccounts as e:
+        raise TooManyAccounts(e.platform, e.username, e.players) from None
+    except RequestError as e:
+        raise type(e)() from None
+
+
+def _cache_profile(key, player, ttl):
+    _PROFILE_CACHE[key] = (time.monotonic() + ttl, player)
+    _PROFILE_CACHE.move_to_end(key)
+    if len(_PROFILE_CACHE) > PROFILE_CACHE_SIZE:
+        _PROFILE_CACHE.popitem(last=False)
+
+
+async def _cached_fetch(session, platform, username, *, ttl=PROFILE_TTL):
+    """Return the player, fetching it only if not cached or expired."""
+    key = (platform, username)
+    try:
+        expires_at, player = _PROFILE_CACHE[key]
     except KeyError:
-        raise commands.BadArgument(_("Unknown platform.")) from None
+        pass
+    else:
+        if time.monotonic() < expires_at:
+            _PROFILE_CACHE.move_to_end(key)
+            if player is None:
+                raise NotFound()
+            return player
+
+    try:
+        data = await _fetch(session, platform, username)
+    except NotFound:
+        _cache_profile(key, None, UNAVAILABLE_TTL)
+        raise
+
+    # players are never mutated, so the same instance can serve every command
+    player = Player(data, platform=platform, username=username)
+    if player.is_private():
+        ttl = max(ttl, UNAVAILABLE_TTL)
+    _cache_profile(key, player, ttl)
+    return player
+
+
+@lru_cache(maxsize=64)
+def _resolve_platform(argument):
+    return _PLATFORM_ALIASES.get(argument.lower())
+
+
+def valid_platform(argument):
+    # most users already type the platform in lowercase
+    platform = _PLATFORM_ALIASES.get(argument) or _resolve_platform(argument)
+    if platform is None:
+        raise commands.BadArgument(_("Unknown platform."))
     return platform
 
 
+def check_username(platform, username):
+    if not _USERNAME_PATTERNS[platform].fullmatch(username):
+        raise commands.BadArgument(
+            _("Invalid username: **{username}**.").format(username=username)
+        )
+
+
 class Stats(commands.Cog):
+
+    __slots__ = ("bot", "recent_queries", "warm_up_task")
+
     def __init__(self, bot):
         self.bot = bot
+        self.recent_queries = deque(maxlen=RECENT_QUERIES_SIZE)
+        self.warm_up_task = bot.loop.create_task(self.warm_up_cache())
+
+    def load_recent_queries(self):
+        with suppress(OSError, ValueError):
+            with open(RECENT_QUERIES_FILE) as fp:
+                self.recent_queries.extend(map(tuple, json.load(fp)))
+
+    def save_recent_queries(self):
+        # drop duplicates, keeping the most recent occurrence
+        queries = list(dict.fromkeys(reversed(self.recent_queries)))[::-1]
+        with suppress(OSError):
+            with open(RECENT_QUERIES_FILE, "w") as fp:
+                json.dump(queries, fp)
+
+    async def warm_up_cache(self):
+        """Fetch the players requested before the last shutdown."""
+        self.load_recent_queries()
+        if not self.recent_queries:
+            return
+
+        await self.bot.wait_until_ready()
+        semaphore = asyncio.Semaphore(WARM_UP_CONCURRENCY)
+
+        async def warm_up(platform, username):
+            async with semaphore:
+                await _cached_fetch(
+                    self.bot.session, platform, username, ttl=WARM_UP_TTL
+                )
+
+        await asyncio.gather(
+            *(warm_up(p, u) for p, u in set(self.recent_queries)),
+            return_exceptions=True,
+        )
+
+    async def _load_profile(self, platform, username):
+        profile = await _cached_fetch(self.bot.session, platform, username)
+        # only remember players that exist, to not request them on startup
+        self.recent_queries.append((platform, username))
+        return profile
 
     async def show_stats_for(self, ctx, hero, platform, username):
-        data = await Request(platform, username).get()
-        profile = Player(data, platform=platform, username=username)
+        # trigger the typing indicator while the player is being fetched
+        profile, unused = await asyncio.gather(
+            self._load_profile(platform, username), ctx.trigger_typing()
+        )
         if profile.is_private():
             embed = profile.private()
         else:
-            embed = profile.get_stats(ctx, hero)
+            # building the pages is pure CPU work, keep it off the event loop
+            embed = await asyncio.to_thread(profile.get_stats, ctx, hero)
         await self.bot.paginator.Paginator(pages=embed).start(ctx)
 
     @commands.command(aliases=["rank", "sr"], brief=_("Returns player ratings."))
+    @commands.cooldown(5, 60.0, commands.BucketType.user)
     @locale
     async def rating(self, ctx, platform: valid_platform, *, username):
         _(
@@ -66,16 +226,18 @@ class Stats(commands.Cog):
         - nintendo-switch: Nintendo Switch ID (format: name-code)
         """
         )
-        async with ctx.typing():
-            data = await Request(platform, username).get()
-            profile = Player(data, platform=platform, username=username)
-            if profile.is_private():
-                embed = profile.private()
-            else:
-                embed = await profile.get_ratings(ctx)
-            await ctx.send(embed=embed)
+        check_username(platform, username)
+        profile, unused = await asyncio.gather(
+            self._load_profile(platform, username), ctx.trigger_typing()
+        )
+        if profile.is_private():
+            embed = profile.private()
+        else:
+            embed = await profile.get_ratings(ctx)
+        await ctx.send(embed=embed)
 
     @commands.command(brief=_("Returns player general stats"))
+    @commands.cooldown(5, 60.0, commands.BucketType.user)
     @locale
     async def stats(self, ctx, platform: valid_platform, *, username):
         _(
@@ -99,10 +261,11 @@ class Stats(commands.Cog):
         - nintendo-switch: Nintendo Switch ID (format: name-code)
         """
         )
-        async with ctx.typing():
-            await self.show_stats_for(ctx, "allHeroes", platform, username)
+        check_username(platform, username)
+        await self.show_stats_for(ctx, "allHeroes", platform, username)
 
     @commands.command(brief=_("Returns player general stats for a given hero."))
+    @commands.cooldown(5, 60.0, commands.BucketType.user)
     @locale
     async def hero(
         self,
@@ -134,8 +297,76 @@ class Stats(commands.Cog):
         - nintendo-switch: Nintendo Switch ID (format: name-code)
         """
         )
-        async with ctx.typing():
-            await self.show_stats_for(ctx, hero, platform, username)
+        check_username(platform, username)
+        await self.show_stats_for(ctx, hero, platform, username)
+
+    @commands.command(aliases=["multisr"], brief=_("Returns multiple players ratings."))
+    @commands.cooldown(1, 60.0, commands.BucketType.user)
+    @locale
+    async def multirating(self, ctx, platform: valid_platform, *, usernames):
+        _(
+            """Returns multiple players ratings.
+
+        `<platform>` - The platform of the players to get ranks for.
+        `<usernames>` - The usernames of the players, separated by commas.
+
+        Up to 5 players can be given at once.
+
+        You can use this command once every 60 seconds.
+
+        Platforms:
+
+        - pc, bnet
+        - playstation, ps, psn, ps4, play
+        - xbox, xbl
+        - nintendo-switch, nsw, switch
+
+        Username:
+
+        - pc: BattleTag (format: name#0000)
+        - playstation: Online ID
+        - xbox: Gamertag
+        - nintendo-switch: Nintendo Switch ID (format: name-code)
+        """
+        )
+        usernames = [u.strip() for u in usernames.split(",") if u.strip()]
+        if not usernames:
+            raise commands.BadArgument(_("You need to enter at least a username."))
+        if len(usernames) > MAX_PLAYERS:
+            raise commands.BadArgument(
+                _("You can't get more than {max} players at once.").format(
+                    max=MAX_PLAYERS
+                )
+            )
+        for username in usernames:
+            check_username(platform, username)
+
+        # fetch every player concurrently, along with the typing indicator
+        unused, *profiles = await asyncio.gather(
+            ctx.trigger_typing(),
+            *(self._load_profile(platform, u) for u in usernames),
+            return_exceptions=True,
+        )
+
+        pages = []
+        for username, profile in zip(usernames, profiles):
+            if isinstance(profile, RequestError):
+                embed = discord.Embed(color=discord.Color.red())
+                embed.title = username
+                embed.description = str(profile)
+            elif isinstance(profile, Exception):
+                raise profile
+            elif profile.is_private():
+                embed = profile.private()
+            else:
+                embed = await profile.get_ratings(ctx)
+            pages.append(embed)
+
+        await self.bot.paginator.Paginator(pages=pages).start(ctx)
+
+    def cog_unload(self):
+        self.warm_up_task.cancel()
+        self.save_recent_queries()
 
 
 def setup(bot):
@@ -296,6 +296,13 @@ ALTER TABLE ONLY public.server
     ADD CONSTRAINT server_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: rating_profile_date_idx; Type: INDEX; Schema: public; Owner: davide
+--
+
+CREATE INDEX rating_profile_date_idx ON public.rating USING btree (profile_id, date);
+
+
 --
 -- Name: member member_fkey; Type: FK CONSTRAINT; Schema: public; Owner: davide
 --
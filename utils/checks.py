@@ -52,7 +52,8 @@ def has_profile():
     """Check for a user to have linked atleast a profile."""
 
     async def predicate(ctx):
-        if await get_profiles(ctx):
+        query = "SELECT 1 FROM profile WHERE member_id = $1 LIMIT 1;"
+        if await ctx.bot.pool.fetchval(query, ctx.author.id) is not None:
             return True
         raise ProfileNotLinked()
 